@@ -20,18 +20,29 @@
 
 
 import argparse
+from contextlib import redirect_stdout
+from functools import lru_cache
+import hashlib
 from importlib import import_module
+import io
+from multiprocessing import Pool
 import os
+import pickle
 from pkgutil import iter_modules
 import sys
+import traceback
 from typing import Tuple, List
 
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
-from .diff import parse_unified_diff, extract_files_lines
+from .diff import parse_changed_lines
 from .linter import Linter
 from .report import Report
-from .utils import run_command, matches_filefilter
+from .utils import run_command, stream_command, filter_files_lines, compile_filefilter
 
 
 __all__ = ['main', 'load_config', 'run_diff', 'filter_configs']
@@ -45,25 +56,166 @@ def main():
     # Load lint configuration for module.
     prefilter, configs = load_config('.cardboardlint.yml', fixers_only=args.fix)
 
-    # Process git diff and select only those files that match the prefilter.
-    files_lines = {
-        filename: linenumbers for filename, linenumbers
-        in run_diff(args.refspec).items()
-        if matches_filefilter(filename, prefilter)}
-
     # Select specific linter if desired.
     configs = filter_configs(configs, args.selection, args.boolexpr, args.part)
 
+    # Process git diff and select only those files that match the prefilter.
+    # Git itself already skips files that none of the selected linters accept.
+    files_lines = run_diff(args.refspec, _get_pathspecs(prefilter, configs), prefilter)
+
+    # Select the files for each linter, once for every distinct filefilter.
+    selected_files_lines = _select_files(files_lines, configs)
+
     returncode = 0
-    for linter, linter_config in configs:
-        report = Report(linter.name, files_lines)
-        report.show_header()
-        linter(linter_config, report, args.numproc, args.fix)
-        if report.show_messages():
-            returncode = -1
+    if args.numproc > 1 and len(configs) > 1 and not args.fix:
+        # Run independent linters in parallel. When there are more cores than
+        # linters, the remaining cores are shared among the linters, which use
+        # them for their own subprocesses or parallel batches.
+        # Fixers are excluded because they may rewrite the same files.
+        linter_numproc = max(1, args.numproc // len(configs))
+        jobs = [(linter, linter_config, linter_files_lines, linter_numproc, False,
+                 args.batch_size)
+                for (linter, linter_config), linter_files_lines
+                in zip(configs, selected_files_lines)]
+        sys.stdout.flush()
+        with Pool(min(args.numproc, len(jobs))) as pool:
+            for output, has_messages, error, formatted_tb in pool.imap(_run_linter_captured, jobs):
+                sys.stdout.write(output)
+                if error is not None:
+                    # The traceback of the worker is lost when the exception is
+                    # pickled, so it is printed here before re-raising.
+                    sys.stdout.flush()
+                    sys.stderr.write(formatted_tb)
+                    raise error
+                if has_messages:
+                    returncode = -1
+    else:
+        for (linter, linter_config), linter_files_lines in zip(configs, selected_files_lines):
+            if _run_linter(linter, linter_config, linter_files_lines, args.numproc, args.fix,
+                           args.batch_size):
+                returncode = -1
     sys.exit(returncode)
 
 
+def _get_pathspecs(prefilter, configs):
+    """Derive git pathspecs that cover all files accepted by the filefilters.
+
+    The include patterns of all linter filefilters are used. The exclude rules of the
+    prefilter that precede its first include rule are passed to git as excludes, such
+    that git does not even descend into excluded directories. This is only done for
+    patterns of the form ``dir/*`` without any other wildcards, for which git and
+    fnmatch select exactly the same files. (A pattern like ``doc`` would be
+    treated by git as a directory prefix.) All other exclude rules are ignored, such
+    that git returns a superset of the files that need to be linted.
+
+    Parameters
+    ----------
+    prefilter : list
+        The filter rules applied before all linter filefilters.
+    configs : list
+        A list of (linter, linter_config) items.
+
+    Returns
+    -------
+    pathspecs : list or None
+        A list of pathspecs for git. None is returned when no restriction is
+        possible.
+
+    """
+    includes = set()
+    for linter, linter_config in configs:
+        for rule in linter_config.get('filefilter', linter.default_config['filefilter']):
+            if rule.startswith('+'):
+                pattern = rule[1:].strip()
+                # A single star matches everything. A leading colon would be
+                # interpreted by git as pathspec magic.
+                if pattern == '*' or pattern.startswith(':'):
+                    includes = None
+                    break
+                includes.add(pattern)
+        if includes is None:
+            break
+    excludes = []
+    for rule in prefilter:
+        if not rule.startswith('-'):
+            break
+        pattern = rule[1:].strip()
+        if _is_plain_directory_pattern(pattern):
+            excludes.append(':(exclude){}'.format(pattern))
+    pathspecs = sorted(includes or []) + excludes
+    if not pathspecs:
+        return None
+    return pathspecs
+
+
+def _is_plain_directory_pattern(pattern):
+    """Return True when pattern is ``dir/*`` with no other special characters."""
+    directory = pattern[:-2]
+    if not pattern.endswith('/*') or not directory or directory[0] in ':/':
+        return False
+    return not any(char in directory for char in '*?[]\\')
+
+
+def _select_files(files_lines, configs):
+    """Filter files_lines with the filefilter of each linter config.
+
+    Configs with the same filefilter, which is common for linters of the same
+    language, share the result. This also keeps the data sent to worker processes
+    small.
+
+    Parameters
+    ----------
+    files_lines : dict
+        Dictionary with (filename, line_numbers) that passed the pre_filefilter.
+    configs : list
+        A list of (linter, linter_config) items.
+
+    Returns
+    -------
+    selected_files_lines : list
+        A files_lines dictionary for each item in configs.
+
+    """
+    cache = {}
+    result = []
+    for linter, linter_config in configs:
+        filefilter = tuple(linter_config.get('filefilter', linter.default_config['filefilter']))
+        selection = cache.get(filefilter)
+        if selection is None:
+            selection = filter_files_lines(files_lines, filefilter)
+            cache[filefilter] = selection
+        result.append(selection)
+    return result
+
+
+def _run_linter(linter, linter_config, files_lines, numproc, fix, batch_size):
+    """Run one linter and print its report. Return True if messages were shown."""
+    # The files were already selected with the filefilter in _select_files.
+    report = Report(linter.name, files_lines, batch_size)
+    report.show_header()
+    linter(linter_config, report, numproc, fix)
+    return report.show_messages()
+
+
+def _run_linter_captured(job):
+    """Run one linter in a worker process.
+
+    Returns the captured output, whether there were messages, and the exception
+    with its formatted traceback if the linter failed (otherwise None twice).
+    """
+    output = io.StringIO()
+    has_messages = False
+    error = None
+    formatted_tb = None
+    with redirect_stdout(output):
+        try:
+            has_messages = _run_linter(*job)
+        except Exception as exc:  # pylint: disable=broad-except
+            error = exc
+            formatted_tb = traceback.format_exc()
+    return output.getvalue(), has_messages, error, formatted_tb
+
+
 def parse_args():
     """Parse the arguments given to the script."""
     def parse_numcpu(string):
@@ -94,8 +246,15 @@ def parse_args():
     parser.add_argument(
         '-n', '--numproc', default=1, type=parse_numcpu,
         help='The number of cores to use. When auto is given, the number of available '
-             'cores is determined with os.cpu_count(). This option is just passed on '
-             'to linters that support it. Cardboardlint still runs all linters serially.')
+             'cores is determined with os.cpu_count(). When more than one core is used, '
+             'the linters run in parallel and the cores are divided among them. Fixers '
+             'and single linters run serially and receive this option instead.')
+    parser.add_argument(
+        '-b', '--batch-size', default=128, type=int,
+        help='The maximum number of files passed to a single linter subprocess. Larger '
+             'selections are split into batches, which limits the length of the command '
+             'line. Use 0 to pass all files at once. Like --numproc, this depends on the '
+             'machine and not on the project, so it is not read from .cardboardlint.yml.')
     parser.add_argument(
         '-F', '--fix', default=False, action='store_true',
         help='Fix problems reported by linters. This restricts the selection of linters '
@@ -109,18 +268,29 @@ def parse_args():
 
 
 def _find_linters():
-    """Return all linters found with pkgutil and importlib."""
+    """Return the module names of all linters found with pkgutil, without importing them.
+
+    The linter name is derived from the module name, e.g. the module linter_rst_lint
+    provides the linter rst-lint.
+    """
     result = {}
     for module_info in iter_modules(import_module('cardboardlint').__path__):
         if not module_info.ispkg and module_info.name.startswith('linter_'):
-            linter_module = import_module('cardboardlint.' + module_info.name)
-            linter = getattr(linter_module, 'LINTER', None)
-            if linter is not None:
-                result[linter.name] = linter
+            linter_name = module_info.name[len('linter_'):].replace('_', '-')
+            result[linter_name] = module_info.name
     return result
 
 
-LINTERS = _find_linters()
+LINTER_MODULES = _find_linters()
+
+
+@lru_cache(maxsize=None)
+def _load_linter(linter_name):
+    """Import the module of a linter on first use and return its Linter, None if unknown."""
+    module_name = LINTER_MODULES.get(linter_name)
+    if module_name is None:
+        return None
+    return getattr(import_module('cardboardlint.' + module_name), 'LINTER', None)
 
 
 def load_config(config_file: str, fixers_only: bool = False) \
@@ -142,10 +312,12 @@ def load_config(config_file: str, fixers_only: bool = False) \
         A list of (linter, linter_config) tuples.
 
     """
-    with open(config_file, 'r') as f:
-        raw_config = yaml.safe_load(f)
+    raw_config = _load_yaml(config_file)
 
     prefilter = raw_config.get('pre_filefilter', ['+ *'])
+    # Filters are checked and compiled once, here. Mistakes are reported before any
+    # linter runs and worker processes inherit the compiled filters.
+    compile_filefilter(prefilter)
 
     configs = []
     for mapping in raw_config['linters']:
@@ -154,24 +326,69 @@ def load_config(config_file: str, fixers_only: bool = False) \
                           'only specify one linter. You probably have to add a dash in '
                           'front of a linter name, e.g. `- import` instead of `import`.')
         linter_name, linter_config = mapping.popitem()
-        linter = LINTERS.get(linter_name)
+        linter = _load_linter(linter_name)
         if linter is None:
             raise ValueError("Unknown linter: {}".format(linter_name))
         if fixers_only and not linter.can_fix:
             continue
         if linter_config is None:
             linter_config = {}
+        compile_filefilter(linter_config.get('filefilter', linter.default_config['filefilter']))
         configs.append((linter, linter_config))
     return prefilter, configs
 
 
-def run_diff(refspec_parent):
+def _load_yaml(filename):
+    """Load a YAML file, reusing a pickled copy from the user cache when it is up to date.
+
+    The cache entry is keyed by the absolute path of the YAML file and validated with its
+    modification time and size. Problems with the cache are silently ignored.
+    """
+    stat = os.stat(filename)
+    path = os.path.abspath(filename)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    cache_dir = os.path.join(
+        os.environ.get('XDG_CACHE_HOME', os.path.expanduser(os.path.join('~', '.cache'))),
+        'cardboardlint')
+    cache_file = os.path.join(
+        cache_dir, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.pkl')
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == key:
+            return data
+    except Exception:  # pylint: disable=broad-except
+        # A missing, truncated or otherwise corrupt cache file is just a cache miss.
+        pass
+
+    with open(filename, 'r') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = '{}.{}'.format(cache_file, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((key, data), f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return data
+
+
+def run_diff(refspec_parent, pathspecs=None, filefilter=None):
     """Run git diff with respect to current branch.
 
     Parameters
     ----------
     refspec_parent : str
         Reference to the parent branch
+    pathspecs : list of str
+        When given, git only considers files matching at least one of these
+        pathspecs.
+    filefilter : list of str
+        When given, only files accepted by these filter rules are included. See
+        ``matches_filefilter``. Other files are skipped while parsing the output
+        of git.
 
     Returns
     -------
@@ -182,24 +399,40 @@ def run_diff(refspec_parent):
         for testing.
 
     """
+    if filefilter is None:
+        accept = None
+    else:
+        # The rules are compiled once, not looked up again for every file.
+        regex, includes = compile_filefilter(filefilter)
+        match = regex.match
+        normcase = os.path.normcase
+
+        def accept(filename):
+            found = match(normcase(filename))
+            return found is not None and found.lastindex in includes
     if refspec_parent is not None:
         # The option --relative is used to limit the output of git diff to the current
         # directory, to facilitate test runs in subdirectories.
         # -U0: generate 0 lines of context (i.e. only the lines that differ)
         command = ['git', 'diff', '-U0', refspec_parent, '--relative']
-        # git diff should not print out binary data by default
-        diff_output = run_command(command)[0]
-        patch = parse_unified_diff(diff_output, 'a/', 'b/')
-        files_lines = extract_files_lines(patch)
+        if pathspecs is not None:
+            command += ['--'] + pathspecs
+        # git diff should not print out binary data by default. The output is
+        # parsed while it is streamed, to avoid keeping large diffs in memory.
+        # Only the hunk headers are needed to find the new lines.
+        files_lines = parse_changed_lines(stream_command(command, env=_git_env()), 'b/', accept)
     else:
         # Just get the current list of files in the repo, including
-        # untracked files, and include all lines
-        command = ['git', 'ls-files', '--exclude-standard']
-        ls_output = run_command(command)[0]
-        files_lines = {filename: None for filename in ls_output.splitlines()}
-        command = ['git', 'ls-files', '--others', '--exclude-standard']
-        ls_output = run_command(command)[0]
-        files_lines.update({filename: None for filename in ls_output.splitlines()})
+        # untracked files, and include all lines. A single git call lists
+        # both tracked (--cached) and untracked (--others) files.
+        command = ['git', 'ls-files', '--cached', '--others', '--exclude-standard']
+        if pathspecs is not None:
+            command += ['--'] + pathspecs
+        ls_output = run_command(command, env=_git_env())[0]
+        # Filenames are interned, such that the same string object is shared
+        # with all messages reported on a file.
+        files_lines = {sys.intern(filename): None for filename in ls_output.splitlines()
+                       if accept is None or accept(filename)}
     print('SELECTED FILES     :')
     for filename, lines in sorted(files_lines.items()):
         if lines is None:
@@ -210,6 +443,22 @@ def run_diff(refspec_parent):
     return files_lines
 
 
+GIT_PATHSPEC_VARIABLES = frozenset([
+    'GIT_LITERAL_PATHSPECS', 'GIT_GLOB_PATHSPECS', 'GIT_NOGLOB_PATHSPECS',
+    'GIT_ICASE_PATHSPECS'])
+
+
+def _git_env():
+    """Return the environment for git, without variables that change pathspec matching.
+
+    The pathspecs and their magic derived by ``_get_pathspecs`` assume the default
+    matching rules of git, so that git selects a superset of the files accepted by
+    the filefilters.
+    """
+    return {name: value for name, value in os.environ.items()
+            if name not in GIT_PATHSPEC_VARIABLES}
+
+
 def filter_configs(configs, selection, boolexpr, part):
     """Select some linter configs to be executed, based on the selection CLI argument.
 
@@ -233,22 +482,31 @@ def filter_configs(configs, selection, boolexpr, part):
         A reduced list of items from configs.
 
     """
-    # Pass 1: by linter name (selection list)
+    # The part N/M is parsed first, such that mistakes are reported early.
+    offset, step = get_offset_step(part)
+    names = None
     if not (selection is None or selection == []):
-        configs = [config for config in configs if config[0].name in selection]
-    # Pass 2: boolean expression
+        names = set(selection)
+    code = None
     if not (boolexpr is None or boolexpr == ''):
-        oldconfigs = configs
-        configs = []
-        for config in oldconfigs:
-            namespace = config[0].flags.copy()
+        code = compile(boolexpr, '<boolexpr>', 'eval')
+    # Single pass over the configs, by linter name (selection list) and by boolean
+    # expression.
+    filtered_configs = []
+    # One namespace dictionary is reused for all linters.
+    namespace = {}
+    for config in configs:
+        if names is not None and config[0].name not in names:
+            continue
+        if code is not None:
+            namespace.clear()
+            namespace.update(config[0].flags)
             namespace['name'] = config[0].name
-            if eval(boolexpr, namespace):  # pylint: disable=eval-used
-                configs.append(config)
-    # Pass 3: part N/M
-    offset, step = get_offset_step(part)
-    configs = configs[offset::step]
-    return configs
+            if not eval(code, namespace):  # pylint: disable=eval-used
+                continue
+        filtered_configs.append(config)
+    # Part N/M
+    return filtered_configs[offset::step]
 
 
 def get_offset_step(suffix):
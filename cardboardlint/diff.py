@@ -26,10 +26,15 @@ needs and can be implemented with much simpler datastructures, which have no
 internally redundant information, making it easier to remove or add hunks.
 """
 
-from typing import NamedTuple, List
+from bisect import bisect_right
+import io
+import re
+import sys
+from typing import Callable, Iterable, NamedTuple, List, Union
 
 
-__all__ = ['Hunk', 'PatchedFile', 'parse_unified_diff', 'extract_files_lines']
+__all__ = ['Hunk', 'PatchedFile', 'LineRanges', 'parse_unified_diff', 'extract_files_lines',
+           'parse_changed_lines']
 
 
 class Hunk(NamedTuple):
@@ -106,14 +111,81 @@ class PatchedFile(NamedTuple):
         return [hunk.target_length for hunk in self.hunks]
 
 
-def parse_unified_diff(diff_output: str, source_prefix: str,
+class LineRanges:
+    """Sorted and non-overlapping ranges of line numbers.
+
+    This is a compact alternative to a set of line numbers for the lines changed in
+    a file, which are mostly contiguous. Overlap with a range of lines is tested with
+    a binary search.
+    """
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, ranges: Iterable[range] = ()):
+        """Initialize line ranges.
+
+        Parameters
+        ----------
+        ranges
+            Ranges of line numbers (with step 1), in any order. Overlapping and
+            adjacent ranges are merged.
+
+        """
+        starts = []
+        ends = []
+        for lines in sorted(ranges, key=lambda lines: lines.start):
+            if len(lines) == 0:
+                continue
+            if ends and lines.start <= ends[-1]:
+                ends[-1] = max(ends[-1], lines.stop)
+            else:
+                starts.append(lines.start)
+                ends.append(lines.stop)
+        self.starts = tuple(starts)
+        self.ends = tuple(ends)
+
+    def isdisjoint(self, lines: range) -> bool:
+        """Return True if none of the given lines (a range with step 1) is included."""
+        # Index of the first range that ends after the start of lines.
+        index = bisect_right(self.ends, lines.start)
+        return index == len(self.ends) or self.starts[index] >= lines.stop
+
+    def __contains__(self, lineno: int) -> bool:
+        """Test if a line number is included."""
+        return not self.isdisjoint(range(lineno, lineno + 1))
+
+    def __iter__(self):
+        """Iterate over all line numbers."""
+        for start, end in zip(self.starts, self.ends):
+            yield from range(start, end)
+
+    def __len__(self):
+        """Return the number of lines."""
+        return sum(self.ends) - sum(self.starts)
+
+    def __eq__(self, other):
+        """Compare with other line ranges or with a set of line numbers."""
+        if isinstance(other, LineRanges):
+            return self.starts == other.starts and self.ends == other.ends
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        """Return a representation that can be evaluated."""
+        return 'LineRanges([{}])'.format(', '.join(
+            'range({}, {})'.format(start, end) for start, end in zip(self.starts, self.ends)))
+
+
+def parse_unified_diff(diff_output: Union[str, Iterable[str]], source_prefix: str,
                        target_prefix: str) -> List[PatchedFile]:
     """Parse the output of a unified diff and return the files with lines that are new.
 
     Parameters
     ----------
     diff_output
-        The standard output of the diff command
+        The standard output of the diff command, either as a single string or
+        as an iterable over its lines, e.g. a stream from a subprocess.
     source_prefix
         The prefix directory used for the source files. This is stripped.
     target_prefix
@@ -125,74 +197,88 @@ def parse_unified_diff(diff_output: str, source_prefix: str,
         A list of files with patch data.
 
     """
-    hunks = None
+    if isinstance(diff_output, str):
+        # Lines are read one at a time, such that lines which are not kept do not
+        # all exist as separate strings at the same time.
+        diff_output = io.StringIO(diff_output)
     result = []
-    lines = diff_output.splitlines()
-    iline = 0
-    while iline < len(lines):
-        line = lines[iline]
-        if line.startswith('--- '):
-            source_filename = _parse_diff_filename(line, source_prefix, "Source")
-            iline += 1
-            hunks = None
-        elif line.startswith('+++ '):
-            target_filename = _parse_diff_filename(line, target_prefix, "Target")
-            iline += 1
+    hunks = None
+    source_filename = None
+    target_filename = None
+    # Current position in the source file, counting from zero.
+    start = None
+    # Data of the hunk being parsed, if any: its start and its removed and added
+    # lines, still with the leading - or +.
+    source_start = None
+    body = []
+    for line in diff_output:
+        line = line.rstrip('\n')
+        first = line[:1]
+        if first in ('+', '-') and not line.startswith(('+++ ', '--- ')):
+            assert hunks is not None
+            if source_start is None:
+                source_start = start
+            body.append(line)
+            continue
+        if first == '\\':
+            # A line like "\ No newline at end of file" does not end a hunk.
+            continue
+        # Any other line ends the current hunk.
+        if source_start is not None:
+            start += _append_hunk(hunks, source_start, body)
+            source_start = None
+            body = []
+        if first == ' ':
+            start += 1
+        elif line.startswith(('--- ', '+++ ')):
+            source_filename, target_filename = _parse_file_header(
+                line, source_filename, target_filename, source_prefix, target_prefix)
             hunks = None
         elif line.startswith('@@ '):
-            # Counting from zero
-            start = int(line.split()[1][1:].split(',')[0]) - 1
+            start = _parse_hunk_start(line)
             if hunks is None:
                 hunks = []
                 result.append(PatchedFile(source_filename, target_filename, hunks))
-            iline += 1
-        elif line[0] in '+- ':
-            assert hunks is not None
-            iline = _parse_hunks(iline, start, lines, hunks)
-        else:
-            iline += 1
+    if source_start is not None:
+        _append_hunk(hunks, source_start, body)
     return result
 
 
+def _parse_file_header(line, source_filename, target_filename, source_prefix, target_prefix):
+    """Parse a line starting with '--- ' or '+++ ' and return the updated filenames."""
+    if line.startswith('--- '):
+        return _parse_diff_filename(line, source_prefix, "Source"), target_filename
+    return source_filename, _parse_diff_filename(line, target_prefix, "Target")
+
+
+def _parse_hunk_start(line):
+    """Return the zero-based source position from a line starting with '@@ '."""
+    return int(line.split()[1][1:].split(',')[0]) - 1
+
+
+def _append_hunk(hunks, source_start, body):
+    """Split the body of a hunk into removed and added lines and append the hunk.
+
+    Returns the number of removed lines, i.e. the length of the hunk in the source.
+    """
+    del_lines = [line[1:] for line in body if line[0] == '-']
+    add_lines = [line[1:] for line in body if line[0] == '+']
+    hunks.append(Hunk(source_start, del_lines, add_lines))
+    return len(del_lines)
+
+
 def _parse_diff_filename(line, prefix, label):
-    """Parse a unified diff line starting with '--- ' or '+++ '."""
+    """Parse a unified diff line starting with '--- ' or '+++ '.
+
+    The filename is interned, such that the same string object is shared by all
+    dictionaries and messages referring to the file.
+    """
     filename = line.split()[1]
     if filename == '/dev/null':
-        filename = None
-    else:
-        if not filename.startswith(prefix):
-            raise ValueError("{} prefix not found: {}".format(label, filename))
-        filename = filename[len(prefix):]
-    return filename
-
-
-def _parse_hunks(iline, start, lines, hunks):
-    """Parse hunks within one @@ section of a unified diff file."""
-    del_lines = []
-    add_lines = []
-    source_start = None
-    while True:
-        line = '' if iline == len(lines) else lines[iline]
-        if line != "" and line[0] in '+-' and line[:4] not in ['+++ ', '--- ']:
-            iline += 1
-            if source_start is None:
-                source_start = start
-            if line[0] == '-':
-                start += 1
-                del_lines.append(line[1:])
-            else:
-                add_lines.append(line[1:])
-        else:
-            if add_lines or del_lines:
-                hunks.append(Hunk(source_start, del_lines, add_lines))
-                source_start = None
-                del_lines = []
-                add_lines = []
-            if line.startswith(' '):
-                start += 1
-                iline += 1
-            else:
-                return iline
+        return None
+    if not filename.startswith(prefix):
+        raise ValueError("{} prefix not found: {}".format(label, filename))
+    return sys.intern(filename[len(prefix):])
 
 
 def extract_files_lines(patch: List[PatchedFile]) -> dict:
@@ -206,16 +292,89 @@ def extract_files_lines(patch: List[PatchedFile]) -> dict:
     Returns
     -------
     files_lines
-        A dictionary whose keys are filenames in and whose values are line
-        indexes of new lines.
+        A dictionary whose keys are filenames in and whose values are LineRanges
+        with line indexes of new lines.
 
     """
     result = {}
     for patched_file in patch:
         if patched_file.target_filename is not None:
-            lines = set([])
-            for target_start, target_length in zip(patched_file.target_starts,
-                                                   patched_file.target_lengths):
-                lines.update(range(target_start, target_start + target_length))
-            result[patched_file.target_filename] = lines
+            # Same as zip(target_starts, target_lengths), without building the lists.
+            ranges = []
+            offset = 0
+            for hunk in patched_file.hunks:
+                target_start = hunk.source_start + offset
+                target_length = len(hunk.add_lines)
+                ranges.append(range(target_start, target_start + target_length))
+                offset += target_length - len(hunk.del_lines)
+            result[patched_file.target_filename] = LineRanges(ranges)
     return result
+
+
+# Header of a hunk: @@ -source_start[,source_length] +target_start[,target_length] @@
+_HUNK_HEADER = re.compile(r'@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@')
+
+
+def parse_changed_lines(diff_output: Union[str, Iterable[str]], target_prefix: str,
+                        accept: Callable[[str], bool] = None) -> dict:
+    """Get all target files and corresponding lines that are new from a diff.
+
+    This gives the same result as ``extract_files_lines(parse_unified_diff(...))`` for
+    a diff without context lines (``git diff -U0``), but it only looks at the file
+    and hunk headers. The removed and added lines themselves are skipped, using the
+    line counts in the hunk headers, and they are never stored.
+
+    Parameters
+    ----------
+    diff_output
+        The standard output of the diff command, either as a single string or
+        as an iterable over its lines, e.g. a stream from a subprocess.
+    target_prefix
+        The prefix directory used for the target files. This is stripped.
+    accept
+        When given, only target files for which this function returns True are
+        included in the result. The hunks of other files are skipped.
+
+    Returns
+    -------
+    files_lines
+        A dictionary whose keys are filenames in and whose values are LineRanges
+        with line indexes of new lines.
+
+    """
+    if isinstance(diff_output, str):
+        # Lines are read one at a time, such that lines which are not kept do not
+        # all exist as separate strings at the same time.
+        diff_output = io.StringIO(diff_output)
+    ranges = {}
+    target_filename = None
+    # Shift of the target lines with respect to the source, due to earlier hunks.
+    offset = 0
+    # Number of removed and added lines still to be skipped in the current hunk.
+    nskip = 0
+    for line in diff_output:
+        if nskip > 0:
+            # A line like "\ No newline at end of file" is not counted.
+            if not line.startswith('\\'):
+                nskip -= 1
+        elif line.startswith('+++ '):
+            target_filename = _parse_diff_filename(line.rstrip('\n'), target_prefix, "Target")
+            if accept is not None and target_filename is not None \
+                    and not accept(target_filename):
+                target_filename = None
+            offset = 0
+        elif line.startswith('@@ '):
+            match = _HUNK_HEADER.match(line)
+            if match is None:
+                raise ValueError('Could not parse hunk header: {}'.format(line.rstrip('\n')))
+            source_start, source_length, target_length = match.groups()
+            # Same conventions as in parse_unified_diff and PatchedFile.target_starts.
+            target_start = int(source_start) - 1 + offset
+            source_length = 1 if source_length is None else int(source_length)
+            target_length = 1 if target_length is None else int(target_length)
+            offset += target_length - source_length
+            nskip = source_length + target_length
+            if target_filename is not None:
+                ranges.setdefault(target_filename, []).append(
+                    range(target_start, target_start + target_length))
+    return {filename: LineRanges(file_ranges) for filename, file_ranges in ranges.items()}
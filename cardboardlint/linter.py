@@ -19,6 +19,8 @@
 """Collection of classes and methods shared between different linters."""
 
 import codecs
+from functools import lru_cache
+from multiprocessing import Pool, current_process
 from typing import List
 
 from .report import Report
@@ -31,6 +33,8 @@ __all__ = ['Linter']
 class Linter:
     """Run linter function with appropriate argument and keep track of meta info."""
 
+    __slots__ = ('name', 'lint', 'default_config', 'style', 'language', 'flags', 'can_fix')
+
     def __init__(self, name, lint, default_config, style='static',
                  language='generic', can_fix=False):
         """Initialize a Linter intsance.
@@ -69,7 +73,8 @@ class Linter:
         config
             Dictionary that contains the configuration for the linter.
         report
-            Collection of filenames and corresponding messages.
+            Collection of filenames and corresponding messages. The filenames must
+            already be selected with the filefilter of the config.
         numproc
             The number of processors to use.
         fixit
@@ -85,14 +90,17 @@ class Linter:
             raise ValueError('Linter {} cannot fix files.'.format(self.name))
         # Complete the config dictionary with default values.
         config = apply_config_defaults(self.name, config, self.default_config)
-        # Filter files to be reported on.
-        report.filter_files(config['filefilter'])
         # Call the linter and return messages
         return self.lint(config, report, numproc, fixit)
 
 
+@lru_cache(maxsize=None)
 def derive_flags(style, language):
-    """Create a dictionary of boolean flags."""
+    """Create a dictionary of boolean flags.
+
+    The result is cached and shared by all linters with the same style and language,
+    so it must not be modified.
+    """
     valid_styles = ['static', 'dynamic']
     if style not in valid_styles:
         raise ValueError('Linter style should be one of {}'.format(valid_styles))
@@ -126,13 +134,12 @@ def apply_config_defaults(linter_name, config, default_config):
 
     """
     # Check for unknown config keys
-    for key in config:
-        if key not in default_config:
-            raise ValueError('Unknown config key for linter {}: {}'.format(linter_name, key))
+    unknown = config.keys() - default_config.keys()
+    if unknown:
+        raise ValueError('Unknown config key for linter {}: {}'.format(
+            linter_name, ', '.join(sorted(unknown))))
     # Fill in the default values
-    merged_config = default_config.copy()
-    merged_config.update(config)
-    return merged_config
+    return {**default_config, **config}
 
 
 def process_patch(patch: List[PatchedFile], report: Report, fixit: bool = False):
@@ -181,3 +188,45 @@ def check_patched_file(patched_file):
     if patched_file.source_filename != patched_file.target_filename:
         raise NotImplementedError("Renaming of files is not supported.")
     return patched_file.target_filename
+
+
+def check_files(check, filenames: List[str], args: tuple = (), numproc: int = 1):
+    """Apply a check to a list of files, in parallel processes when possible.
+
+    Parameters
+    ----------
+    check
+        A module-level function, called as ``check(filename, *args)``, which returns a
+        list of (lineno, text) messages for the file.
+    filenames
+        The files to be checked.
+    args
+        Additional arguments for the check function.
+    numproc
+        The number of processes to use. Processes are not used when the linter is
+        already running in a worker process of cardboardlint, because these cannot
+        have child processes.
+
+    Returns
+    -------
+    results
+        A list with a (messages, error) tuple for each file. When the file could not be
+        decoded, messages is None and error is the error message. Otherwise, error is
+        None.
+
+    """
+    jobs = [(check, filename, args) for filename in filenames]
+    if numproc <= 1 or len(jobs) <= 1 or current_process().daemon:
+        return [_check_file_job(job) for job in jobs]
+    numproc = min(numproc, len(jobs))
+    with Pool(numproc) as pool:
+        return pool.map(_check_file_job, jobs, max(1, len(jobs) // (numproc * 4)))
+
+
+def _check_file_job(job):
+    """Apply a check to one file, see ``check_files``."""
+    check, filename, args = job
+    try:
+        return check(filename, *args), None
+    except UnicodeDecodeError as err:
+        return None, str(err)
@@ -24,7 +24,7 @@ This test calls the autopep8 program, see https://github.com/hhatto/autopep8
 from .diff import parse_unified_diff
 from .linter import Linter, process_patch
 from .report import Report
-from .utils import run_command
+from .utils import run_commands, probe_version
 
 
 __all__ = []
@@ -42,7 +42,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, fixit: bool = False):
     """Lint with autopep8.
 
     Parameters
@@ -51,7 +51,7 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     fixit
         When True, the linter will try to fix (a part of) the problems in each
@@ -59,20 +59,22 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
 
     """
     # get autopep8 version
-    command = ['autopep8', '--version']
-    version_info = run_command(command, verbose=False)[0]
+    version_info = probe_version('autopep8')
     print('USING              : {0}'.format(version_info))
 
-    if len(report.filenames) > 0:
-        command = ['autopep8', '-d'] + report.filenames
+    commands = []
+    for filenames in report.batches():
+        command = ['autopep8', '-d'] + filenames
         if config['config'] is not None:
             command += ['--global-config={}'.format(config['config']),
                         '--ignore-local-config']
         if config['line-range'] is not None:
             low, high = config['line-range']
             command += ['--line-range', str(low), str(high)]
-        output = run_command(command)[0]
-        if len(output) > 0:
+        commands.append(command)
+    for output, _ in run_commands(commands, numproc, capture_stderr=False):
+        # Output without hunks, e.g. only file headers, contains no changes.
+        if '@@ ' in output:
             patch = parse_unified_diff(output, 'original/', 'fixed/')
             process_patch(patch, report, fixit)
 
@@ -24,7 +24,7 @@ This test calls the black program, see https://black.readthedocs.io/en/stable/
 from .diff import parse_unified_diff
 from .linter import Linter, process_patch
 from .report import Report
-from .utils import run_command
+from .utils import run_commands, probe_version
 
 
 __all__ = []
@@ -40,7 +40,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, fixit: bool = False):
     """Lint with black.
 
     Parameters
@@ -49,7 +49,7 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     fixit
         When True, the linter will try to fix (a part of) the problems in each
@@ -57,17 +57,19 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
 
     """
     # get black version
-    command = ['black', '--version']
-    version_info = run_command(command, verbose=False)[0]
+    version_info = probe_version('black')
     print('USING              : {0}'.format(version_info))
 
-    if len(report.filenames) > 0:
+    commands = []
+    for filenames in report.batches():
         command = ['black', '--diff', '--target-version', config['target_version']]
-        command += report.filenames
+        command += filenames
         if config['config'] is not None:
             command += ['--config={}'.format(config['config'])]
-        output = run_command(command)[0]
-        if len(output) > 0:
+        commands.append(command)
+    for output, _ in run_commands(commands, numproc, capture_stderr=False):
+        # Output without hunks, e.g. only file headers, contains no changes.
+        if '@@ ' in output:
             patch = parse_unified_diff(output, '', '')
             process_patch(patch, report, fixit)
 
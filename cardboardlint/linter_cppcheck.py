@@ -21,11 +21,15 @@
 This test calls the cppcheck program, see http://cppcheck.sourceforge.net/.
 """
 
-from xml.etree import ElementTree
+import os
+try:
+    from lxml.etree import XMLPullParser, XMLSyntaxError as ParseError
+except ImportError:
+    from xml.etree.ElementTree import XMLPullParser, ParseError
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import stream_command, probe_version
 
 
 __all__ = []
@@ -34,17 +38,20 @@ __all__ = []
 DEFAULT_CONFIG = {
     # Filename filter rules
     'filefilter': ['+ *.h', '+ *.h.in', '+ *.cpp', '+ *.c'],
+    # Optional directory where cppcheck keeps its analysis results between runs,
+    # such that unchanged files are not analyzed again. Caching this directory in CI
+    # speeds up later runs.
+    'build-dir': None,
 }
 
 
-def lint(_config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """Lint with cppcheck.
 
     Parameters
     ----------
-    _config
+    config
         Dictionary that contains the configuration for the linter.
-        _config is not used by this linter.
     report
         Collection of filenames and corresponding messages.
     numproc
@@ -56,29 +63,66 @@ def lint(_config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """
     # Get version
     print('USING VERSION      : {0}'.format(
-        run_command(['cppcheck', '--version'], verbose=False)[0].strip()))
+        probe_version('cppcheck').strip()))
 
     if len(report.filenames) > 0:
         # Call Cppcheck
         command = (['cppcheck', '-j', str(numproc)] + report.filenames +
                    ['-q', '--enable=all', '--language=c++', '--std=c++11', '--xml',
                     '--suppress=missingIncludeSystem', '--suppress=unusedFunction'])
-        xml_str = run_command(command)[1]
-        etree = ElementTree.fromstring(xml_str)
-
-        # Parse the output of Cppcheck into standard return values
-        for error in etree:
-            if 'file' not in error.attrib:
-                continue
-            # key = '{:<15}  {:<40}  {:<30}' % (error.attrib['severity'],
-            #                                   error.attrib['file'],
-            #                                   error.attrib['id'])
-            text = '{} {} {}'.format(
-                error.attrib['severity'], error.attrib['id'], error.attrib['msg'])
-            lineno = int(error.attrib['line'])
-            if lineno == 0:
-                lineno = None
-            report(error.attrib['file'], lineno, None, text)
+        if config['build-dir'] is not None:
+            os.makedirs(config['build-dir'], exist_ok=True)
+            command.append('--cppcheck-build-dir={}'.format(config['build-dir']))
+        # The XML on stderr is parsed while Cppcheck is running, such that the
+        # complete output and its tree are never kept in memory.
+        parser = XMLPullParser()
+        parse_errors = []
+
+        def has_failed(returncode, _stdout, _stderr):
+            """Detect a failure of Cppcheck, including output that is not valid XML."""
+            if not parse_errors:
+                try:
+                    parser.close()
+                except ParseError as exc:
+                    parse_errors.append(exc)
+            for exc in parse_errors:
+                print('INVALID XML        : {}'.format(exc))
+            return returncode != 0 or len(parse_errors) > 0
+
+        for data in stream_command(command, has_failed=has_failed, stderr=True, binary=True):
+            if not parse_errors:
+                try:
+                    parser.feed(data)
+                    _parse_errors(parser.read_events(), report)
+                except ParseError as exc:
+                    # The rest of the output is only kept to be printed.
+                    parse_errors.append(exc)
+        # Errors completed by closing the parser.
+        _parse_errors(parser.read_events(), report)
+
+
+def _parse_errors(events, report: Report):
+    """Report the errors found in the XML output of Cppcheck.
+
+    Parameters
+    ----------
+    events
+        The (event, element) pairs of the end events of the parsed XML elements.
+    report
+        Collection of filenames and corresponding messages.
+
+    """
+    for _event, error in events:
+        attrib = error.attrib
+        if error.tag != 'error' or 'file' not in attrib:
+            continue
+        text = ' '.join((attrib['severity'], attrib['id'], attrib['msg']))
+        lineno = int(attrib['line'])
+        if lineno == 0:
+            lineno = None
+        report(attrib['file'], lineno, None, text)
+        # Free the parsed element, it is no longer needed.
+        error.clear()
 
 
 LINTER = Linter('cppcheck', lint, DEFAULT_CONFIG, language='cpp')
@@ -21,9 +21,11 @@
 This test calls the cpplint.py program, see https://github.com/google/styleguide
 """
 
+import re
+
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import run_commands
 
 
 __all__ = []
@@ -41,12 +43,19 @@ DEFAULT_CONFIG = {
 }
 
 
+# A message from cpplint: filename:lineno:  description  [category] [confidence]
+# The separators only match spaces and tabs, such that a match never continues on the
+# next line.
+_MESSAGE = re.compile(r'^([^\s:]*):(\d+):(?:[ \t]+([^\n]*?))?[ \t]+(\S+)[ \t]+(\S+)[ \t]*$',
+                      re.MULTILINE)
+
+
 def _has_failed(_returncode, stdout, _stderr):
     """Determine if cpplint.py has failed."""
     return 'FATAL' in stdout
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """Lint with cpplint.
 
     Parameters
@@ -55,33 +64,30 @@ def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     _fixit
         When True, the linter will try to fix (a part of) the problems in each
         file.
 
     """
-    if len(report.filenames) > 0:
+    commands = []
+    for filenames in report.batches():
         # Call cpplint
         command = [config['script'], '--linelength={}'.format(config['linelength'])]
         if config['filter'] != '':
             command.append('--filter={}'.format(config['filter']))
-        command.extend(report.filenames)
-        output = run_command(command, has_failed=_has_failed)[1]
-
+        command.extend(filenames)
+        commands.append(command)
+    for _, output in run_commands(commands, numproc, has_failed=_has_failed):
         # Parse the output of cpplint into standard return values
-        for line in output.split('\n')[:-1]:
-            words = line.split()
-            if len(words) == 0 or words[0].count(':') != 2:
-                continue
-            filename, lineno = words[0].split(':')[:2]
-            description = ' '.join(words[1:-2])
-            tag = words[-2]
-            priority = words[-1]
+        for match in _MESSAGE.finditer(output):
+            filename, lineno, description, tag, priority = match.groups()
             lineno = int(lineno)
             if lineno == 0:
                 lineno = None
+            # Runs of whitespace in the description are collapsed.
+            description = '' if description is None else ' '.join(description.split())
             report(filename, lineno, None, '{} {} {}'.format(priority, tag, description))
 
 
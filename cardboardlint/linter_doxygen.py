@@ -22,10 +22,11 @@ This linter uses doxygen, see http://www.doxygen.org.
 """
 
 import os
+import re
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import run_command, probe_version
 
 
 __all__ = []
@@ -51,6 +52,11 @@ GENERATE_AUTOGEN_DEF   = NO
 """
 
 
+# A warning line, formatted as specified by WARN_FORMAT in DOXYGEN_CONFIG. The
+# separator only matches spaces and tabs, such that a match stays on one line.
+_WARNING = re.compile(r'^~~WARN~~ (\S+)[ \t]+(.*)$', re.MULTILINE)
+
+
 def lint(_config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
     """Lint with doxygen to find undocumented headers.
 
@@ -68,10 +74,9 @@ def lint(_config: dict, report: Report, _numproc: int = 1, _fixit: bool = False)
         file.
 
     """
-    command = ['doxygen', '--version']
-    print('USING              : doxygen', run_command(command, verbose=False)[0].strip())
-
     if len(report.filenames) > 0:
+        print('USING              : doxygen', probe_version('doxygen').strip())
+
         # Call doxygen in the doc subdirectory, mute output because it only confuses
         command = ['doxygen', '-']
         stdin = DOXYGEN_CONFIG.format(' '.join(report.filenames))
@@ -79,17 +84,15 @@ def lint(_config: dict, report: Report, _numproc: int = 1, _fixit: bool = False)
         print(stdin)
         output = run_command(command, stdin=stdin)[1]
 
-        # Parse the file doxygen_warnings
+        # Parse the warnings, without splitting the output in lines first.
         prefix = os.getcwd() + '/'
-
-        lines = output.split('\n')
-        for line in lines:
-            if line.startswith('~~WARN~~'):
-                location, description = line[9:].split(None, 1)
-                filename, lineno = location.split(':')[:2]
-                if filename.startswith(prefix):
-                    filename = filename[len(prefix):]
-                report(filename, int(lineno), None, description)
+        nprefix = len(prefix)
+        for match in _WARNING.finditer(output):
+            location, description = match.groups()
+            filename, lineno = location.split(':')[:2]
+            if filename.startswith(prefix):
+                filename = filename[nprefix:]
+            report(filename, int(lineno), None, description)
 
 
 LINTER = Linter('doxygen', lint, DEFAULT_CONFIG, language='cpp')
@@ -23,7 +23,7 @@ This test calls the flake program, see http://flake8.pycqa.org
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import stream_command, probe_version
 
 
 __all__ = []
@@ -59,19 +59,17 @@ def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
 
     """
     # get flake8 version
-    command = ['flake8', '--version']
-    version_info = run_command(command, verbose=False)[0]
+    version_info = probe_version('flake8')
     print('USING              : {0}'.format(version_info))
 
-    if len(report.filenames) > 0:
-        command = ['flake8', '--jobs={}'.format(numproc)] + report.filenames
+    for filenames in report.batches():
+        command = ['flake8', '--jobs={}'.format(numproc)] + filenames
         if config['config'] is not None:
             command += ['--config={0}'.format(config['config'])]
-        output = run_command(command, has_failed=_has_failed)[0]
-        if len(output) > 0:
-            for line in output.splitlines():
-                words = line.split(':')
-                report(words[0], int(words[1]), int(words[2]), words[3].strip())
+        # The output is parsed while it is decoded, without keeping it in memory.
+        for line in stream_command(command, has_failed=_has_failed):
+            words = line.split(':')
+            report(words[0], int(words[1]), int(words[2]), words[3].strip())
 
 
 LINTER = Linter('flake8', lint, DEFAULT_CONFIG, language='python')
@@ -25,9 +25,12 @@ present, such as a shebang line or a mode line.
 """
 
 import codecs
-from typing import List
+from functools import lru_cache
+from itertools import islice
+import os
+from typing import List, Tuple
 
-from .linter import Linter
+from .linter import Linter, check_files
 from .report import Report
 
 
@@ -49,7 +52,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, fixit: bool = False):
     """Lint and optionally fix source file headers.
 
     Parameters
@@ -58,7 +61,7 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     fixit
         When True, the linter will try to fix (a part of) the problems in each
@@ -69,41 +72,56 @@ def lint(config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
     print('CHECKING FILES     : {0}'.format(' '.join(report.filenames)))
 
     # Load the header file as a set of lines
-    with codecs.open(config['header'], encoding='utf-8') as f:
-        header_lines = list(f)
+    stat = os.stat(config['header'])
+    header_lines = _load_header(config['header'], stat.st_mtime_ns, stat.st_size)
+
+    # Check the header in all files.
+    filenames = report.filenames
+    results = check_files(_check_file, filenames, (config, header_lines), numproc)
+    for filename, (messages, error) in zip(filenames, results):
+        if error is not None:
+            report(filename, None, None, error)
+            continue
+        needs_fixing = False
+        for lineno, text in messages:
+            if report(filename, lineno, None, text):
+                needs_fixing = True
+        # Fix if requested
+        if fixit and needs_fixing:
+            _fix_file(filename, config, header_lines)
 
-    # Loop all files and check in the header each file.
-    for filename in report.filenames:
-        try:
-            _check_file(filename, config, header_lines, report, fixit)
-        except UnicodeDecodeError as err:
-            report(filename, None, None, str(err))
 
+@lru_cache(maxsize=64)
+def _load_header(path: str, _mtime_ns: int, _size: int) -> List[str]:
+    """Load the lines of a header file.
 
-def _check_file(filename: str, config: dict, header_lines: List[str],
-                report: Report, fixit: bool = False):
-    """Look for bad filename headers.
+    The result is cached, such that the header is read only once when the linter is
+    used with several configurations. The modification time and the size of the file
+    are only part of the cache key, such that a modified header file is read again.
+    The result must not be modified.
+    """
+    with codecs.open(path, encoding='utf-8') as f:
+        return list(f)
+
+
+def _get_expected_lines(lines: List[str], config: dict, header_lines: List[str]) -> List[str]:
+    """Build the list with expected lines at the start of a file.
 
     Parameters
     ----------
-    filename
-        File to be checked
+    lines
+        The lines of the file.
     config
         Dictionary with configuration of the linters.
     header_lines
         The expected header.
-    report
-        Collection of filenames and corresponding messages.
-    fixit
-        When True, header issues in the file are fixed. The file is only
-        rewritten if changes are needed.
 
-    """
-    # Load all lines from the file.
-    with codecs.open(filename, encoding='utf-8') as f:
-        lines = list(f)
+    Returns
+    -------
+    expected_lines
+        The lines that should be present at the start of the file.
 
-    # Build the list with expected lines
+    """
     expected_lines = []
     if lines and lines[0].startswith('#!') and config['shebang'] is not None:
         expected_lines.append(config['shebang'] + '\n')
@@ -113,28 +131,68 @@ def _check_file(filename: str, config: dict, header_lines: List[str],
     for header_line in header_lines:
         expected_lines.append((comment + header_line).rstrip() + '\n')
     expected_lines.append(comment + '--\n')
+    return expected_lines
+
+
+def _check_file(filename: str, config: dict, header_lines: List[str]) \
+        -> List[Tuple[int, str]]:
+    """Look for bad filename headers.
+
+    Parameters
+    ----------
+    filename
+        File to be checked
+    config
+        Dictionary with configuration of the linters.
+    header_lines
+        The expected header.
+
+    Returns
+    -------
+    messages
+        A list of (lineno, text) for each line that differs from the expected header.
+
+    """
+    # Load only the lines that are compared with the expected header. The first line
+    # determines the expected number of lines.
+    with codecs.open(filename, encoding='utf-8') as f:
+        lines = list(islice(f, 1))
+        expected_lines = _get_expected_lines(lines, config, header_lines)
+        lines.extend(islice(f, len(expected_lines) - 1))
 
     # Compare expected with actual
-    needs_fixing = False
-    for lineno, (expected_line, line) in enumerate(zip(expected_lines, lines)):
-        if expected_line != line:
-            if report(filename, lineno + 1, None,
-                      'Line should be: {}'.format(expected_line[:-1])):
-                needs_fixing = True
+    return [(lineno + 1, 'Line should be: {}'.format(expected_line[:-1]))
+            for lineno, (expected_line, line) in enumerate(zip(expected_lines, lines))
+            if expected_line != line]
+
+
+def _fix_file(filename: str, config: dict, header_lines: List[str]):
+    """Replace the header of a file by the expected one.
 
-    # Fix if requested
-    if fixit and needs_fixing:
-        try:
-            first_keep = lines.index(expected_lines[-1]) + 1
-        except ValueError:
-            if lines and lines[0].startswith('#!'):
-                first_keep = 1
-            else:
-                first_keep = 0
-        lines = lines[first_keep:]
-        lines = expected_lines + lines
-        with codecs.open(filename, 'w', encoding='utf-8') as f:
-            f.write(''.join(lines))
+    Parameters
+    ----------
+    filename
+        File to be fixed
+    config
+        Dictionary with configuration of the linters.
+    header_lines
+        The expected header.
+
+    """
+    with codecs.open(filename, encoding='utf-8') as f:
+        lines = list(f)
+    expected_lines = _get_expected_lines(lines, config, header_lines)
+    try:
+        first_keep = lines.index(expected_lines[-1]) + 1
+    except ValueError:
+        if lines and lines[0].startswith('#!'):
+            first_keep = 1
+        else:
+            first_keep = 0
+    lines = lines[first_keep:]
+    lines = expected_lines + lines
+    with codecs.open(filename, 'w', encoding='utf-8') as f:
+        f.write(''.join(lines))
 
 
 LINTER = Linter('header', lint, DEFAULT_CONFIG, can_fix=True)
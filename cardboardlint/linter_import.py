@@ -30,9 +30,10 @@ This script counts the number of bad imports. The following is not allowed in a
   names from the submodules.
 """
 
-import codecs
+import re
+from typing import List, Pattern, Tuple
 
-from .linter import Linter
+from .linter import Linter, check_files
 from .report import Report
 
 
@@ -47,7 +48,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """Lint import statements.
 
     Parameters
@@ -68,33 +69,48 @@ def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
 
     # Loop all python and cython files
     if len(config['packages']) > 0:
-        for filename in report.filenames:
-            try:
-                _check_file(filename, config, report)
-            except UnicodeDecodeError as err:
-                report(filename, None, None, str(err))
-
-
-def _check_file(filename: str, config: dict, report: Report):
+        # All bad imports are found with a single regular expression, compiled once.
+        pattern = re.compile(u'from ({0}) import'.format(
+            '|'.join(re.escape(package) for package in config['packages'])))
+        filenames = report.filenames
+        results = check_files(_check_file, filenames, (pattern,), numproc)
+        for filename, (messages, error) in zip(filenames, results):
+            if error is not None:
+                report(filename, None, None, error)
+                continue
+            for lineno, text in messages:
+                report(filename, lineno, None, text)
+
+
+def _check_file(filename: str, pattern: Pattern) -> List[Tuple[int, str]]:
     """Look for bad imports in the given file.
 
     Parameters
     ----------
     filename
         File to be checked
-    config
-        Dictionary with configuration of the linters.
-    report
-        Collection of filenames and corresponding messages.
+    pattern
+        A regular expression matching the bad import statements. Its first group is
+        the name of the package.
+
+    Returns
+    -------
+    messages
+        A list of (lineno, text) for each bad import.
 
     """
-    with codecs.open(filename, encoding='utf-8') as f:
-        for lineno, line in enumerate(f):
-            for package in config['packages']:
-                # skip version import
-                if u'from {0} import'.format(package) in line:
-                    text = 'Wrong import from {0}'.format(package)
-                    report(filename, lineno+1, None, text)
+    # The file is decoded at once and searched in a single pass. Line numbers are only
+    # computed for the matches.
+    with open(filename, 'rb') as f:
+        text = f.read().decode('utf-8')
+    messages = []
+    lineno = 1
+    pos = 0
+    for match in pattern.finditer(text):
+        lineno += text.count('\n', pos, match.start())
+        pos = match.start()
+        messages.append((lineno, 'Wrong import from {0}'.format(match.group(1))))
+    return messages
 
 
 LINTER = Linter('import', lint, DEFAULT_CONFIG, language='python')
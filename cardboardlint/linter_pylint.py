@@ -25,7 +25,7 @@ import json
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import run_command, probe_version
 
 
 __all__ = []
@@ -56,8 +56,7 @@ def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
 
     """
     # get Pylint version
-    command = ['pylint', '--version']
-    version_info = ' '.join(run_command(command, verbose=False)[0].split('\n')[:-3])
+    version_info = ' '.join(probe_version('pylint').split('\n')[:-3])
     print('USING              : {0}'.format(version_info))
 
     def has_failed(returncode, _stdout, _stderr):
@@ -69,7 +68,8 @@ def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
         command += ['--jobs={}'.format(numproc), '--output-format=json']
         if config['config'] is not None:
             command += ['--rcfile={0}'.format(config['config'])]
-        output = run_command(command, has_failed=has_failed)[0]
+        output = run_command(command, has_failed=has_failed, binary=True,
+                             capture_stderr=False)[0]
         if len(output) > 0:
             for plmap in json.loads(output):
                 charno = plmap['column']
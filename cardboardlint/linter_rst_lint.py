@@ -26,7 +26,7 @@ import json
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import run_commands, probe_version
 
 
 __all__ = []
@@ -38,7 +38,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(_config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
+def lint(_config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """Lint with restructuredtext-lint.
 
     Parameters
@@ -47,24 +47,26 @@ def lint(_config: dict, report: Report, _numproc: int = 1, _fixit: bool = False)
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     _fixit
         When True, the linter will try to fix (a part of) the problems in each
         file.
 
     """
-    command = ['rst-lint', '--version']
-    version_info = ''.join(run_command(command, verbose=False)[0].split('\n')[:2])
+    version_info = ''.join(probe_version('rst-lint').split('\n')[:2])
     print('USING              : {0}'.format(version_info))
 
     def has_failed(returncode, _stdout, _stderr):
         """Determine if rst-lint ran correctly."""
         return returncode == 1
 
-    if len(report.filenames) > 0:
-        command = ['rst-lint', '--format', 'json'] + report.filenames
-        output = run_command(command, has_failed=has_failed)[0]
+    commands = []
+    for filenames in report.batches():
+        command = ['rst-lint', '--format', 'json'] + filenames
+        commands.append(command)
+    for output, _ in run_commands(commands, numproc, has_failed=has_failed, binary=True,
+                                  capture_stderr=False):
         if len(output) > 0:
             for rlmap in json.loads(output):
                 report(rlmap['source'], rlmap['line'], None,
@@ -23,7 +23,7 @@ This test calls the flake program, see https://yamllint.readthedocs.io/en/latest
 
 from .linter import Linter
 from .report import Report
-from .utils import run_command
+from .utils import run_commands, probe_version
 
 
 __all__ = []
@@ -37,7 +37,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
+def lint(config: dict, report: Report, numproc: int = 1, _fixit: bool = False):
     """Lint with yamllint.
 
     Parameters
@@ -46,7 +46,7 @@ def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     _fixit
         When True, the linter will try to fix (a part of) the problems in each
@@ -54,19 +54,21 @@ def lint(config: dict, report: Report, _numproc: int = 1, _fixit: bool = False):
 
     """
     # get yamllint version
-    command = ['yamllint', '--version']
-    version_info = run_command(command, verbose=False)[0]
+    version_info = probe_version('yamllint')
     print('USING              : {0}'.format(version_info))
 
     def has_failed(returncode, _stdout, _stderr):
         """Determine if yamllint ran correctly."""
         return not 0 <= returncode < 2
 
-    if len(report.filenames) > 0:
-        command = ['yamllint', '-f', 'parsable'] + report.filenames
+    commands = []
+    for filenames in report.batches():
+        command = ['yamllint', '-f', 'parsable'] + filenames
         if config['config'] is not None:
             command += ['-c', config['config']]
-        output = run_command(command, has_failed=has_failed)[0]
+        commands.append(command)
+    for output, _ in run_commands(commands, numproc, has_failed=has_failed,
+                                  capture_stderr=False):
         if len(output) > 0:
             for line in output.splitlines():
                 words = line.split(':')
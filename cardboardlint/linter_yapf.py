@@ -24,7 +24,7 @@ This test calls the yapf program, see https://github.com/google/yapf
 from .diff import parse_unified_diff
 from .linter import Linter, process_patch
 from .report import Report
-from .utils import run_command
+from .utils import run_commands, probe_version
 
 
 __all__ = []
@@ -36,7 +36,7 @@ DEFAULT_CONFIG = {
 }
 
 
-def lint(_config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
+def lint(_config: dict, report: Report, numproc: int = 1, fixit: bool = False):
     """Lint with yapf.
 
     Parameters
@@ -45,7 +45,7 @@ def lint(_config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
         Dictionary that contains the configuration for the linter.
     report
         Collection of filenames and corresponding messages.
-    _numproc
+    numproc
         The number of processors to use.
     fixit
         When True, the linter will try to fix (a part of) the problems in each
@@ -53,17 +53,20 @@ def lint(_config: dict, report: Report, _numproc: int = 1, fixit: bool = False):
 
     """
     # get yapf version
-    command = ['yapf', '--version']
-    version_info = run_command(command, verbose=False)[0]
+    version_info = probe_version('yapf')
     print('USING              : {0}'.format(version_info))
 
     def has_failed(_returncode, _stdout, _stderr):
         return False
 
-    if len(report.filenames) > 0:
-        command = ['yapf', '-d'] + report.filenames
-        output = run_command(command, has_failed=has_failed)[0]
-        if len(output) > 0:
+    commands = []
+    for filenames in report.batches():
+        command = ['yapf', '-d'] + filenames
+        commands.append(command)
+    for output, _ in run_commands(commands, numproc, has_failed=has_failed,
+                                  capture_stderr=False):
+        # Output without hunks, e.g. only file headers, contains no changes.
+        if '@@ ' in output:
             patch = parse_unified_diff(output, '', '')
             process_patch(patch, report, fixit)
 
@@ -19,9 +19,10 @@
 """Collection of classes and methods shared between different linters."""
 
 
+import sys
 import time
 
-from .utils import matches_filefilter
+from .utils import filter_files_lines
 
 
 __all__ = ['Report']
@@ -30,7 +31,7 @@ __all__ = ['Report']
 class Report:
     """A collections of filenames (with line numbers( and linter messages."""
 
-    def __init__(self, linter_name: str, files_lines: dict):
+    def __init__(self, linter_name: str, files_lines: dict, batch_size: int = None):
         """Initialize a Report object.
 
         Parameters
@@ -39,10 +40,14 @@ class Report:
             The name of the linter to report on.
         files_lines
             Dictionary with (filename, line_numbers) to report on.
+        batch_size
+            The maximum number of filenames passed to a single linter
+            subprocess. When None or zero, all files are linted at once.
 
         """
         self.linter_name = linter_name
         self.files_lines = files_lines
+        self.batch_size = batch_size
         self.messages = []
         self._start_time = None
 
@@ -51,6 +56,16 @@ class Report:
         """Return the filenames to be linted."""
         return list(self.files_lines.keys())
 
+    def batches(self):
+        """Return the sorted filenames to be linted, split in lists of at most batch_size."""
+        filenames = sorted(self.files_lines)
+        if not filenames:
+            return []
+        if not self.batch_size:
+            return [filenames]
+        return [filenames[i:i + self.batch_size]
+                for i in range(0, len(filenames), self.batch_size)]
+
     def __call__(self, filename: str, lineno: int, charno: int, text: str,
                  nline: int = 1) -> bool:
         """Propose a new error message.
@@ -77,19 +92,21 @@ class Report:
             branch.
 
         """
-        if filename in self.files_lines:
+        # Linters normally only report on the files they were given, so a single
+        # dictionary lookup suffices in the common case.
+        try:
             line_numbers = self.files_lines[filename]
-            if line_numbers is None or lineno is None or any(
-                    iline in line_numbers for iline in range(lineno, lineno + nline)):
-                self.messages.append(Message(filename, lineno, charno, text, nline))
-                return True
+        except KeyError:
+            return False
+        if line_numbers is None or lineno is None or not line_numbers.isdisjoint(
+                range(lineno, lineno + nline)):
+            self.messages.append(Message(filename, lineno, charno, text, nline))
+            return True
         return False
 
     def filter_files(self, filefilter):
         """Restrict the filenames to report on by the given file filters."""
-        self.files_lines = dict(
-            (filename, lines) for filename, lines in self.files_lines.items()
-            if matches_filefilter(filename, filefilter))
+        self.files_lines = filter_files_lines(self.files_lines, filefilter)
 
     def show_header(self):
         """Print a report header."""
@@ -101,15 +118,15 @@ class Report:
     def show_messages(self):
         """Print messages for the current linter to stdout."""
         if self.messages:
-            self.messages.sort()
-            print()
-            last = None
+            self.messages.sort(key=Message.sort_key)
+            lines = []
             for message in self.messages:
                 # Simple code to hide duplicates.
                 current = message.format()
-                if current != last:
-                    print(current)
-                last = current
+                if not lines or current != lines[-1]:
+                    lines.append(current)
+            # Write all messages at once.
+            sys.stdout.write('\n{}\n'.format('\n'.join(lines)))
         print()
         print('WALL TIME          : {:.2f} seconds'.format(time.time() - self._start_time))
         print()
@@ -120,6 +137,8 @@ class Report:
 class Message:
     """Error message and meta information."""
 
+    __slots__ = ('filename', 'lineno', 'charno', 'text', 'nline')
+
     def __init__(self, filename: str, lineno: int, charno: int, text: str, nline: int = 1):
         """Initialize a message.
 
@@ -139,13 +158,16 @@ class Message:
             The number of lines this message applies to.
 
         """
-        if not (lineno is None or (isinstance(lineno, int) and lineno > 0)):
-            raise TypeError('`lineno` must be a positive integer or None')
-        if not (charno is None or (isinstance(charno, int) and charno > 0)):
-            raise TypeError('`charno` must be a positive integer or None')
-        if not (isinstance(nline, int) and nline > 0):
-            raise TypeError('`nline` must be a strictly positive integer, got {}.'.format(nline))
-        self.filename = filename
+        # The checks are skipped when Python runs with -O.
+        if __debug__:
+            if not (lineno is None or (isinstance(lineno, int) and lineno > 0)):
+                raise TypeError('`lineno` must be a positive integer or None')
+            if not (charno is None or (isinstance(charno, int) and charno > 0)):
+                raise TypeError('`charno` must be a positive integer or None')
+            if not (isinstance(nline, int) and nline > 0):
+                raise TypeError(
+                    '`nline` must be a strictly positive integer, got {}.'.format(nline))
+        self.filename = None if filename is None else sys.intern(filename)
         self.lineno = lineno
         self.charno = charno
         self.text = text
@@ -155,29 +177,39 @@ class Message:
         """Test if one Message is less than another."""
         if self.__class__ != other.__class__:
             raise TypeError('A Message instance can only be compared to another Message instance.')
-        tup_self = (self.filename or '', self.lineno or 0, self.charno or 0, self.text)
-        tup_other = (other.filename or '', other.lineno or 0, other.charno or 0, other.text)
-        return tup_self < tup_other
+        # Same order as sort_key, without building tuples. Fields are compared one
+        # by one until they differ.
+        mine, theirs = self.filename or '', other.filename or ''
+        if mine != theirs:
+            return mine < theirs
+        mine, theirs = self.lineno or 0, other.lineno or 0
+        if mine != theirs:
+            return mine < theirs
+        mine, theirs = self.charno or 0, other.charno or 0
+        if mine != theirs:
+            return mine < theirs
+        return self.text < other.text
+
+    def sort_key(self):
+        """Return a tuple that determines the order of messages, without None values."""
+        return (self.filename or '', self.lineno or 0, self.charno or 0, self.text)
 
     def format(self, color=True):
         """Return a nicely formatted string representation of the message."""
         if color:
             purple, red, endcolor, bold = '\033[35m', '\033[31m', '\033[0m', '\033[1m'
         else:
-            purple, red, endcolor, bold = ['']*4
-        # Fix the location string
+            purple, red, endcolor, bold = '', '', '', ''
         if self.filename is None:
-            location = bold + '(nofile)' + endcolor
-        else:
-            linechar = '{}{}:{}'.format(
-                '-' if self.lineno is None else self.lineno,
-                '..{}'.format(self.lineno + self.nline - 1) if self.nline > 1 else '',
-                '-' if self.charno is None else self.charno,
-            )
-            location = '{0}{1:9s}{2} {3}{4}{2}'.format(
-                bold + red, linechar, endcolor, purple, str(self.filename))
-        # Return string with location and text
-        return '{}  {}'.format(location, self.text)
+            return '{}(nofile){}  {}'.format(bold, endcolor, self.text)
+        # The location string and the text are formatted in one go.
+        linechar = '{}{}:{}'.format(
+            '-' if self.lineno is None else self.lineno,
+            '..{}'.format(self.lineno + self.nline - 1) if self.nline > 1 else '',
+            '-' if self.charno is None else self.charno,
+        )
+        return '{0}{1}{2:9s}{3} {4}{5}{3}  {6}'.format(
+            bold, red, linechar, endcolor, purple, self.filename, self.text)
 
     def __str__(self):
         """Return a human-readable string representation."""
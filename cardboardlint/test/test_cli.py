@@ -19,9 +19,12 @@
 """Test cardboardlint.cli."""
 
 
+import subprocess
+
 from pytest import raises
 
-from ..cli import get_offset_step, filter_configs
+from ..cli import (get_offset_step, filter_configs, load_config, LINTER_MODULES, _load_linter,
+                   _get_pathspecs, _select_files, run_diff)
 from ..linter_cppcheck import LINTER as linter_cppcheck
 from ..linter_pylint import LINTER as linter_pylint
 from ..linter_import import LINTER as linter_import
@@ -85,3 +88,99 @@ def test_filter_configs():
     assert filter_configs(configs, None, 'name == "pylint"', '') == [configs[0], configs[1]]
     assert filter_configs(configs, None, 'name != "cppcheck"', '') == \
         [configs[0], configs[1], configs[5]]
+
+
+def test_load_linter():
+    assert 'rst-lint' in LINTER_MODULES
+    for linter_name in LINTER_MODULES:
+        assert _load_linter(linter_name).name == linter_name
+    assert _load_linter('cppcheck') is linter_cppcheck
+    assert _load_linter('foo') is None
+
+
+def test_load_config(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    config_file = tmp_path / 'cardboardlint.yml'
+    config_file.write_text("pre_filefilter: ['- *.txt', '+ *']\n"
+                           "linters:\n  - cppcheck:\n  - import:\n      packages: ['foo']\n")
+    expected = (['- *.txt', '+ *'], [(linter_cppcheck, {}), (linter_import, {'packages': ['foo']})])
+    assert load_config(str(config_file)) == expected
+    assert len(list((tmp_path / 'cache' / 'cardboardlint').iterdir())) == 1
+    # The second time, the pickled cache is used.
+    assert load_config(str(config_file)) == expected
+    assert load_config(str(config_file), fixers_only=True) == (['- *.txt', '+ *'], [])
+    # A corrupt cache file is ignored.
+    cache_file, = (tmp_path / 'cache' / 'cardboardlint').iterdir()
+    cache_file.write_bytes(b'cbuiltins\nnonexisting\n.')
+    assert load_config(str(config_file)) == expected
+    cache_file.write_bytes(b'\x80\x03')
+    assert load_config(str(config_file)) == expected
+    config_file.write_text("linters:\n  - cppcheck:\n      filefilter: ['* *.cpp']\n")
+    with raises(ValueError):
+        load_config(str(config_file))
+
+
+def test_select_files():
+    files_lines = {'a.py': None, 'b.h': set([1, 2]), 'test/test_c.py': set([3]), 'd.txt': None}
+    configs = [
+        (linter_pylint, {}),
+        (linter_cppcheck, {}),
+        (linter_import, {}),
+        (linter_pylint, {'filefilter': ['- test/*', '+ *.py']}),
+        (linter_cppcheck, {'filefilter': ['+ *.h', '+ *.h.in', '+ *.cpp', '+ *.c']}),
+    ]
+    selected = _select_files(files_lines, configs)
+    assert selected == [
+        {'a.py': None, 'test/test_c.py': set([3])},
+        {'b.h': set([1, 2])},
+        {'a.py': None},
+        {'a.py': None},
+        {'b.h': set([1, 2])},
+    ]
+    # Same filefilter, same result.
+    assert selected[1] is selected[4]
+
+
+def test_get_pathspecs():
+    assert _get_pathspecs([], []) is None
+    assert _get_pathspecs(['+ *'], [(linter_cppcheck, {})]) == [
+        '*.c', '*.cpp', '*.h', '*.h.in']
+    assert _get_pathspecs(['+ *'], [
+        (linter_pylint, {'filefilter': ['- test/*', '+ *.py']}),
+        (linter_cppcheck, {'filefilter': ['+ *.h', '+ *.py']}),
+    ]) == ['*.h', '*.py']
+    assert _get_pathspecs([], [(linter_pylint, {'filefilter': ['- *.txt', '+ *']})]) is None
+    # Only the leading exclude rules of the prefilter become git excludes.
+    assert _get_pathspecs(['- build/*', '- doc/*', '+ doc/a.rst', '- tools/*', '+ *'], [
+        (linter_pylint, {'filefilter': ['+ *']}),
+    ]) == [':(exclude)build/*', ':(exclude)doc/*']
+    assert _get_pathspecs(['- build/*', '+ *'], [(linter_pylint, {'filefilter': ['+ *.py']})]) == [
+        '*.py', ':(exclude)build/*']
+    # Excludes for which git and fnmatch may disagree are left to the prefilter.
+    assert _get_pathspecs(['- doc', '- *.txt', '- a*/*', '+ *'], [
+        (linter_pylint, {'filefilter': ['+ *']}),
+    ]) is None
+
+
+def test_run_diff_prefilter(tmp_path, monkeypatch):
+    for filename in ['a.py', 'doc/b.py', 'doc/sub/c.py', 'docs/d.py', 'e.txt']:
+        path = tmp_path / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('pass\n')
+    subprocess.check_call(['git', 'init', '-q', str(tmp_path)])
+    monkeypatch.chdir(tmp_path)
+    configs = [(linter_pylint, {'filefilter': ['+ *']})]
+    # The pathspecs may only speed up git, the selected files must not change.
+    for prefilter in (['- doc', '+ *'], ['- doc/*', '+ *'], ['- doc*', '- *.txt', '+ *']):
+        baseline = run_diff(None, None, prefilter)
+        assert run_diff(None, _get_pathspecs(prefilter, configs), prefilter) == baseline
+    assert sorted(run_diff(None, _get_pathspecs(['- doc', '+ *'], configs), ['- doc', '+ *'])) == [
+        'a.py', 'doc/b.py', 'doc/sub/c.py', 'docs/d.py', 'e.txt']
+    # Environment variables that change the pathspec matching of git are ignored.
+    prefilter = ['- doc/*', '+ *']
+    pathspecs = _get_pathspecs(prefilter, [(linter_pylint, {'filefilter': ['+ *.py']})])
+    baseline = run_diff(None, pathspecs, prefilter)
+    assert sorted(baseline) == ['a.py', 'docs/d.py']
+    for name in 'GIT_LITERAL_PATHSPECS', 'GIT_GLOB_PATHSPECS', 'GIT_ICASE_PATHSPECS':
+        monkeypatch.setenv(name, '1')
+        assert run_diff(None, pathspecs, prefilter) == baseline
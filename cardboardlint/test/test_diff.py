@@ -19,7 +19,9 @@
 """Unit tests for cardboardlint.diff."""
 
 
-from ..diff import parse_unified_diff, extract_files_lines
+import io
+
+from ..diff import LineRanges, parse_unified_diff, extract_files_lines, parse_changed_lines
 
 
 DIFF1 = """\
@@ -87,12 +89,40 @@ def test_parse_unified_diff1():
     assert pf2.hunks[0].del_lines == ['  script: python setup.py install']
 
 
+def test_parse_unified_diff1_lines():
+    lines = io.StringIO(DIFF1)
+    assert parse_unified_diff(lines, 'a/', 'b/') == parse_unified_diff(DIFF1, 'a/', 'b/')
+
+
 def test_extract_files_lines1():
     patch = parse_unified_diff(DIFF1, 'a/', 'b/')
     files_lines = extract_files_lines(patch)
     assert files_lines == {
         '.travis.yaml': set([43]),
         'python-qcgrids/tools/conda.recipe/meta.yaml': set([12, 13, 14, 15, 16, 17])}
+    assert files_lines['.travis.yaml'] == LineRanges([range(43, 44)])
+    assert parse_changed_lines(DIFF1, 'b/') == files_lines
+    assert parse_changed_lines(io.StringIO(DIFF1), 'b/') == files_lines
+
+
+def test_line_ranges():
+    lines = LineRanges([range(10, 12), range(3, 5), range(5, 7), range(8, 8), range(4, 6)])
+    assert lines.starts == (3, 10)
+    assert lines.ends == (7, 12)
+    assert len(lines) == 6
+    assert list(lines) == [3, 4, 5, 6, 10, 11]
+    assert lines == set([3, 4, 5, 6, 10, 11])
+    assert lines == LineRanges([range(3, 7), range(10, 12)])
+    assert lines != LineRanges([range(3, 7)])
+    assert eval(repr(lines)) == lines  # pylint: disable=eval-used
+    for lineno in range(15):
+        assert (lineno in lines) == (lineno in set(lines))
+        for nline in range(1, 5):
+            assert lines.isdisjoint(range(lineno, lineno + nline)) == \
+                set(lines).isdisjoint(range(lineno, lineno + nline))
+    empty = LineRanges()
+    assert len(empty) == 0
+    assert empty.isdisjoint(range(1, 100))
 
 
 DIFF2 = '''\
@@ -241,3 +271,47 @@ def test_parse_unified_diff4():
     assert pf1.source_filename == 'poor2.py'
     assert pf1.hunks[0].source_start == 24
     assert pf1.hunks[1].source_start == 30
+
+
+DIFF5 = '''\
+--- a/foo.txt
++++ b/foo.txt
+@@ -3 +3,2 @@
+-last
+\\ No newline at end of file
++last
++extra
+'''
+
+
+def test_parse_unified_diff5():
+    patch = parse_unified_diff(DIFF5, 'a/', 'b/')
+    assert len(patch) == 1
+    assert len(patch[0].hunks) == 1
+    assert patch[0].hunks[0].source_start == 2
+    assert patch[0].hunks[0].del_lines == ['last']
+    assert patch[0].hunks[0].add_lines == ['last', 'extra']
+    assert parse_changed_lines(DIFF5, 'b/') == extract_files_lines(patch)
+
+
+DIFF6 = """\
+--- a/foo.py
++++ b/foo.py
+@@ -3 +3,2 @@
+-++ removed
++++ added
++--- added
+@@ -10,0 +12 @@
++new
+"""
+
+
+def test_parse_changed_lines6():
+    # Removed and added lines that look like file headers are skipped.
+    assert parse_changed_lines(DIFF6, 'b/') == {'foo.py': LineRanges([range(2, 4), range(10, 11)])}
+
+
+def test_parse_changed_lines_accept():
+    files_lines = parse_changed_lines(DIFF1, 'b/', lambda filename: filename[0] == '.')
+    assert files_lines == {'.travis.yaml': LineRanges([range(43, 44)])}
+    assert parse_changed_lines(DIFF1, 'b/', lambda filename: False) == {}
@@ -21,7 +21,7 @@
 
 from pytest import raises
 
-from ..linter import derive_flags, apply_config_defaults
+from ..linter import derive_flags, apply_config_defaults, check_files
 
 
 def test_flags():
@@ -30,6 +30,7 @@ def test_flags():
     assert not flags['dynamic']
     assert flags['cpp']
     assert not flags['python']
+    assert derive_flags('static', 'cpp') is flags
 
     with raises(ValueError):
         derive_flags('foo', 'cpp')
@@ -44,3 +45,27 @@ def test_apply_config_defaults():
     assert apply_config_defaults('boo', {}, default_config) == {'a': 0, 'b': -1, 'c': 3}
     with raises(ValueError):
         apply_config_defaults('boo', config, {'a': 1})
+
+
+def _count_lines(filename, word):
+    """Return a message for every line that contains word."""
+    with open(filename, encoding='utf-8') as f:
+        return [(lineno, word) for lineno, line in enumerate(f, 1) if word in line]
+
+
+def test_check_files(tmp_path):
+    filenames = []
+    for i in range(5):
+        path = tmp_path / 'file{}.txt'.format(i)
+        path.write_text('foo\n' * i + 'bar\n')
+        filenames.append(str(path))
+    path = tmp_path / 'binary.txt'
+    path.write_bytes(b'foo\n\xff\xfe\n')
+    filenames.insert(2, str(path))
+    serial = check_files(_count_lines, filenames, ('foo',), 1)
+    assert check_files(_count_lines, filenames, ('foo',), 2) == serial
+    assert serial[0] == ([], None)
+    assert serial[1] == ([(1, 'foo')], None)
+    assert serial[2][0] is None
+    assert 'decode' in serial[2][1]
+    assert serial[-1] == ([(1, 'foo'), (2, 'foo'), (3, 'foo'), (4, 'foo')], None)
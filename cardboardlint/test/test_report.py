@@ -48,6 +48,12 @@ def test_message():
     # sorting
     msgs = sorted([msg1, msg2, msg3, msg4])
     assert msgs == [msg4, msg2, msg3, msg1]
+    others = [Message(filename, lineno, charno, text)
+              for filename in [None, 'a.py', 'b.py'] for lineno in [None, 1, 2]
+              for charno in [None, 1] for text in ['x', 'y']]
+    for msg_a in others:
+        for msg_b in others:
+            assert (msg_a < msg_b) == (msg_a.sort_key() < msg_b.sort_key())
     with raises(TypeError):
         msgs.insert(0, 1)
         msgs.sort()
@@ -80,3 +86,38 @@ def test_indiff4():
     report = Report('bork', {'foo.txt': set([1])})
     assert not report('test.txt', 1, 4, 'error')
     assert not report('test.txt', None, 4, 'error')
+
+
+def test_batches():
+    files_lines = {'c.py': None, 'a.py': None, 'b.py': set([1])}
+    assert Report('bork', files_lines).batches() == [['a.py', 'b.py', 'c.py']]
+    assert Report('bork', files_lines, 0).batches() == [['a.py', 'b.py', 'c.py']]
+    assert Report('bork', files_lines, 2).batches() == [['a.py', 'b.py'], ['c.py']]
+    assert Report('bork', files_lines, 3).batches() == [['a.py', 'b.py', 'c.py']]
+    assert Report('bork', {}, 2).batches() == []
+
+
+def test_filter_files():
+    files_lines = {'a.py': None, 'b.txt': None}
+    report = Report('bork', files_lines)
+    report.filter_files(['+ *.py'])
+    assert report.files_lines == {'a.py': None}
+
+
+def test_show_messages(capsys):
+    report = Report('bork', {'test.txt': None})
+    report.show_header()
+    assert not report.show_messages()
+    report.show_header()
+    assert report('test.txt', 2, None, 'foo')
+    assert report('test.txt', 1, None, 'bar')
+    assert report('test.txt', 2, None, 'foo')
+    assert report.show_messages()
+    lines = capsys.readouterr().out.splitlines()
+    # Messages are sorted and duplicates are hidden.
+    assert lines[-6:-2] == [
+        '',
+        Message('test.txt', 1, None, 'bar').format(),
+        Message('test.txt', 2, None, 'foo').format(),
+        '',
+    ]
@@ -21,13 +21,75 @@
 
 from pytest import raises
 
-from ..utils import run_command, matches_filefilter
+from ..utils import (run_command, run_commands, stream_command, probe_version,
+                     matches_filefilter, filter_files_lines, STREAM_TAIL_LINES)
 
 
 def test_run_command():
     assert run_command(['echo', 'foo']) == (u'foo\n', u'')
     with raises(RuntimeError):
         run_command(['ls', 'asfdsadsafdasdfasd'])
+    assert run_command(['echo', 'foo'], binary=True) == (b'foo\n', b'')
+    with raises(RuntimeError):
+        run_command(['ls', 'asfdsadsafdasdfasd'], binary=True)
+    assert run_command(['ls', 'asfdsadsafdasdfasd'], has_failed=lambda *_: False,
+                       capture_stderr=False) == ('', None)
+    with raises(RuntimeError):
+        run_command(['ls', 'asfdsadsafdasdfasd'], capture_stderr=False)
+
+
+def test_run_commands(capsys):
+    commands = [['echo', str(i)] for i in range(5)]
+    expected = [('{}\n'.format(i), '') for i in range(5)]
+    assert run_commands(commands) == expected
+    assert run_commands(commands, 3, verbose=False) == expected
+    assert run_commands([], 3) == []
+    capsys.readouterr()
+    run_commands(commands, 3)
+    assert capsys.readouterr().out == ''.join(
+        'RUNNING            : echo {}\n'.format(i) for i in range(5))
+    with raises(RuntimeError):
+        run_commands([['echo', 'foo'], ['ls', 'asfdsadsafdasdfasd']], 2)
+
+
+def test_stream_command():
+    assert list(stream_command(['printf', 'foo\\nbar\\n'])) == ['foo\n', 'bar\n']
+    assert list(stream_command(['true'])) == []
+    with raises(RuntimeError):
+        list(stream_command(['ls', 'asfdsadsafdasdfasd']))
+    assert list(stream_command(['false'], has_failed=lambda returncode, *_: False)) == []
+    with raises(RuntimeError):
+        list(stream_command(['true'], has_failed=lambda returncode, *_: True))
+    command = ['sh', '-c', 'echo foo; echo bar >&2']
+    assert list(stream_command(command, stderr=True)) == ['bar\n']
+    assert list(stream_command(command, stderr=True, binary=True)) == [b'bar\n']
+    outputs = []
+    assert list(stream_command(command, has_failed=lambda *args: outputs.append(args))) \
+        == ['foo\n']
+    assert outputs == [(0, None, 'bar\n')]
+
+
+def test_stream_command_failed(capsys):
+    with raises(RuntimeError):
+        list(stream_command(['sh', '-c', 'echo foo; echo bar >&2; exit 1'], stderr=True))
+    assert capsys.readouterr().out.endswith(
+        'RETURN CODE: 1\nSTDOUT\n------\nfoo\n\nSTDERR\n------\nbar\n\n')
+    # Only the last lines of the streamed output are printed.
+    command = ['sh', '-c', 'seq {}; exit 1'.format(STREAM_TAIL_LINES + 5)]
+    lines = []
+    with raises(RuntimeError):
+        lines.extend(stream_command(command, verbose=False))
+    assert len(lines) == STREAM_TAIL_LINES + 5
+    out = capsys.readouterr().out
+    assert '\n6\n' in out
+    assert '\n5\n' not in out
+    assert '\n{}\n'.format(STREAM_TAIL_LINES + 5) in out
+
+
+def test_probe_version():
+    version_info = probe_version('git')
+    assert version_info.startswith('git version')
+    assert probe_version('git') is version_info
 
 
 def test_matches_filefilter():
@@ -37,8 +99,31 @@ def test_matches_filefilter():
     assert matches_filefilter('foo/a.py', ['- */test_*.py', '+ *.py'])
     assert not matches_filefilter('foo/test/test_a.py', ['- */test_*.py', '+ *.py'])
     assert matches_filefilter('bin/runfoo', ['+ bin/*'])
+    assert not matches_filefilter('a.py', [])
+    assert not matches_filefilter('a.py', ['- *.py', '+ *'])
+    assert matches_filefilter('a.txt', ['- *.py', '+ *'])
+    assert not matches_filefilter('a.txt', ['+ *.py', '- *'])
+    assert matches_filefilter('foo/abcb.py', ['- */t*.py', '+ *a*b*.py', '- *'])
+    assert not matches_filefilter('a.py', ['- *.txt'])
+    assert not matches_filefilter('a.py', ['- *', '+ *.py'])
+    assert matches_filefilter('a.py', ['+ *', '- *.py'])
+    assert matches_filefilter('setup.py', ['+ setup.py'])
+    assert not matches_filefilter('setup.pyc', ['+ setup.py'])
+    assert not matches_filefilter('tools/example/a.py', ['- tools/example/*', '+ *'])
+    assert matches_filefilter('tools/example', ['- tools/example/*', '+ *'])
+    with raises(ValueError):
+        matches_filefilter('foo.py', ['+ *', 'bork'])
 
     with raises(ValueError):
         matches_filefilter('foo.py', ['b *.py'])
     with raises(ValueError):
         matches_filefilter('foo.py', ['bork'])
+
+
+def test_filter_files_lines():
+    files_lines = {'a.py': None, 'foo/test_b.py': set([1]), 'c.txt': set([2])}
+    assert filter_files_lines(files_lines, ['- */test_*.py', '+ *.py']) == {'a.py': None}
+    assert filter_files_lines(files_lines, ['- *.py', '+ *']) == {'c.txt': set([2])}
+    assert filter_files_lines(files_lines, []) == {}
+    with raises(ValueError):
+        filter_files_lines(files_lines, ['b *.py'])
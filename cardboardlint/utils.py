@@ -18,14 +18,32 @@
 # --
 """Utilities used by various parts of cardboardlint."""
 
-from fnmatch import fnmatch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
+from functools import lru_cache
+import os
+import re
+import shutil
 import subprocess
+import tempfile
 
 
-__all__ = ['run_command', 'matches_filefilter']
+__all__ = ['run_command', 'run_commands', 'stream_command', 'probe_version',
+           'matches_filefilter', 'filter_files_lines', 'compile_filefilter']
 
 
-def run_command(command, verbose=True, cwd=None, has_failed=None, stdin=''):
+# The number of lines of a streamed output that are printed when a subprocess fails.
+STREAM_TAIL_LINES = 100
+
+
+def _default_has_failed(returncode, _stdout, _stderr):
+    """Detect failed subprocess, default implementation."""
+    return returncode != 0
+
+
+def run_command(command, verbose=True, cwd=None, has_failed=None, stdin='',
+                binary=False, capture_stderr=True, env=None):
     """Run command as subprocess with default settings suitable for trapdoor scripts.
 
     Parameters
@@ -41,6 +59,16 @@ def run_command(command, verbose=True, cwd=None, has_failed=None, stdin=''):
         behavior is to check for a non-zero return code.
     stdin : str
         Standard input to be provided to the script.
+    binary : bool
+        When set to True, stdout and stderr are returned as bytes, without decoding.
+        This is useful when the output is passed on to a parser that accepts bytes.
+    capture_stderr : bool
+        When set to False, stderr is written to a temporary file instead of being
+        kept in memory. It is only read to be printed when the subprocess has failed.
+        In this case, None is passed to has_failed and returned instead of stderr.
+    env : dict
+        The environment variables of the subprocess. When not given, the environment
+        of the current process is inherited.
 
     Returns
     -------
@@ -53,33 +81,201 @@ def run_command(command, verbose=True, cwd=None, has_failed=None, stdin=''):
     on screen and RuntimeError is raised.
 
     """
-    # Functions to detect failure
-    def default_has_failed(returncode, _stdout, _stderr):
-        """Detect failed subprocess, default implementation."""
-        return returncode != 0
     if has_failed is None:
-        has_failed = default_has_failed
+        has_failed = _default_has_failed
 
     if verbose:
         print('RUNNING            : {0}'.format(' '.join(command)))
-    proc = subprocess.Popen(
-        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE, cwd=cwd)
-    stdout, stderr = proc.communicate(stdin.encode('utf-8'))
-    stdout = stdout.decode('utf-8')
-    stderr = stderr.decode('utf-8')
-    if has_failed(proc.returncode, stdout, stderr):
-        print('RETURN CODE: {}'.format(proc.returncode))
-        print('STDOUT')
-        print('------')
-        print(stdout)
-        print('STDERR')
-        print('------')
-        print(stderr)
-        raise RuntimeError('Subprocess has failed.')
+    ferr = subprocess.PIPE if capture_stderr else tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=ferr, env=env, **_popen_kwargs(command, cwd))
+        stdout, stderr = proc.communicate(stdin.encode('utf-8'))
+        if not binary:
+            stdout = stdout.decode('utf-8')
+            if stderr is not None:
+                stderr = stderr.decode('utf-8')
+        if has_failed(proc.returncode, stdout, stderr):
+            if stderr is None:
+                ferr.seek(0)
+                stderr = ferr.read()
+            print('RETURN CODE: {}'.format(proc.returncode))
+            print('STDOUT')
+            print('------')
+            print(stdout.decode('utf-8', 'replace') if binary else stdout)
+            print('STDERR')
+            print('------')
+            print(stderr if isinstance(stderr, str) else stderr.decode('utf-8', 'replace'))
+            raise RuntimeError('Subprocess has failed.')
+    finally:
+        if not capture_stderr:
+            ferr.close()
     return stdout, stderr
 
 
+def run_commands(commands, numproc=1, verbose=True, **kwargs):
+    """Run several commands with run_command, at most numproc at the same time.
+
+    Parameters
+    ----------
+    commands : list of list of str
+        The commands to be executed.
+    numproc : int
+        The maximum number of commands running at the same time. Threads are
+        used to wait for the subprocesses.
+    verbose : bool
+        When set to False, the commands will not be printed on screen. Otherwise,
+        all commands are printed at once before they are started, such that the
+        lines cannot get mixed up by concurrent threads.
+    kwargs
+        Other arguments passed on to ``run_command``.
+
+    Returns
+    -------
+    outputs : list of (str, str)
+        The stdout and stderr of each command, in the same order as commands.
+
+    """
+    if verbose and commands:
+        print('\n'.join('RUNNING            : {0}'.format(' '.join(command))
+                        for command in commands))
+    if numproc <= 1 or len(commands) <= 1:
+        return [run_command(command, False, **kwargs) for command in commands]
+    with ThreadPoolExecutor(max_workers=numproc) as executor:
+        return list(executor.map(lambda command: run_command(command, False, **kwargs),
+                                 commands))
+
+
+def stream_command(command, verbose=True, cwd=None, has_failed=None, stderr=False,
+                   binary=False, env=None):
+    """Run command as subprocess and iterate over the lines of one of its outputs.
+
+    Unlike ``run_command``, the output is not collected in memory first, such that
+    it can be processed while the subprocess is still running. The output is also
+    decoded one line at a time.
+
+    Parameters
+    ----------
+    command : list of str
+        The command argument to be passed to Popen.
+    verbose : bool
+        When set to False, the command will not be printed on screen.
+    cwd : str
+        The working directory where the command is executed.
+    has_failed : function(returncode, stdout, stderr)
+        A function that determines if the subprocess has failed. The argument of the
+        streamed output is always None because it is not kept in memory. The default
+        behavior is to check for a non-zero return code.
+    stderr : bool
+        When set to True, the standard error is streamed instead of the standard
+        output.
+    binary : bool
+        When set to True, the lines are yielded as bytes, without decoding. The
+        other output is then also passed to has_failed as bytes.
+    env : dict
+        The environment variables of the subprocess. When not given, the environment
+        of the current process is inherited.
+
+    Yields
+    ------
+    line : str or bytes
+        A line from the streamed output, including the trailing newline.
+
+    Raises
+    ------
+    In case the subprocess has failed, the stdout and stderr are printed on screen
+    and RuntimeError is raised, after all lines have been yielded. Only the last
+    ``STREAM_TAIL_LINES`` lines of the streamed output are kept for this purpose.
+
+    """
+    if verbose:
+        print('RUNNING            : {0}'.format(' '.join(command)))
+    tail = deque(maxlen=STREAM_TAIL_LINES)
+    with tempfile.TemporaryFile() as fother:
+        if stderr:
+            pipes = {'stdout': fother, 'stderr': subprocess.PIPE}
+        else:
+            pipes = {'stdout': subprocess.PIPE, 'stderr': fother}
+        with subprocess.Popen(command, **pipes, env=env,
+                              **_popen_kwargs(command, cwd)) as proc:
+            for line in proc.stderr if stderr else proc.stdout:
+                tail.append(line)
+                yield line if binary else line.decode('utf-8')
+        fother.seek(0)
+        other = fother.read()
+        if not binary:
+            other = other.decode('utf-8')
+        if has_failed is None:
+            has_failed = _default_has_failed
+        if stderr:
+            failed = has_failed(proc.returncode, other, None)
+        else:
+            failed = has_failed(proc.returncode, None, other)
+        if failed:
+            streamed = b''.join(tail)
+            outputs = (other, streamed) if stderr else (streamed, other)
+            print('RETURN CODE: {}'.format(proc.returncode))
+            for label, output in zip(['STDOUT', 'STDERR'], outputs):
+                print(label)
+                print('------')
+                print(output if isinstance(output, str) else output.decode('utf-8', 'replace'))
+            raise RuntimeError('Subprocess has failed.')
+
+
+@lru_cache(maxsize=None)
+def probe_version(program):
+    """Return the output of ``program --version``.
+
+    The result is cached, such that the version of a linter that is used with several
+    configurations is only requested once.
+
+    Parameters
+    ----------
+    program : str
+        The name of the program.
+
+    Returns
+    -------
+    version_info : str
+        The standard output of the program.
+
+    """
+    return run_command([program, '--version'], verbose=False)[0]
+
+
+def _popen_kwargs(command, cwd):
+    """Return keyword arguments for Popen that allow it to use posix_spawn.
+
+    CPython only replaces fork+exec by the cheaper posix_spawn when the executable
+    is given with a directory, no cwd is set and file descriptors are not closed.
+    The latter is safe because all file descriptors created by Python are
+    non-inheritable (PEP 446).
+
+    Parameters
+    ----------
+    command : list of str
+        The command argument to be passed to Popen.
+    cwd : str
+        The working directory where the command is executed.
+
+    Returns
+    -------
+    kwargs : dict
+        Keyword arguments for Popen.
+
+    """
+    if cwd is not None:
+        return {'cwd': cwd}
+    return {'executable': _which(command[0]), 'close_fds': False}
+
+
+@lru_cache(maxsize=None)
+def _which(program):
+    """Return the full path of a program, or the program itself when not found."""
+    return shutil.which(program) or program
+
+
 def matches_filefilter(filename, rules):
     """Test a filename against a list of filter rules.
 
@@ -98,14 +294,128 @@ def matches_filefilter(filename, rules):
         True if the file should be included.
 
     """
-    # Check format of the rules
+    regex, includes = compile_filefilter(rules)
+    match = regex.match(os.path.normcase(filename))
+    # The index of the matching group encodes the outcome of the rule.
+    return match is not None and match.lastindex in includes
+
+
+def filter_files_lines(files_lines, rules):
+    """Select the items of files_lines whose filenames pass the filter rules.
+
+    This is equivalent to calling ``matches_filefilter`` on every filename, but the
+    rules are looked up and compiled only once.
+
+    Parameters
+    ----------
+    files_lines : dict
+        Dictionary with (filename, line_numbers) items.
+    rules : list
+        See ``matches_filefilter``.
+
+    Returns
+    -------
+    selected_files_lines : dict
+        The items of files_lines whose filename is accepted.
+
+    """
+    regex, includes = compile_filefilter(rules)
+    match = regex.match
+    normcase = os.path.normcase
+    result = {}
+    for filename, lines in files_lines.items():
+        found = match(normcase(filename))
+        if found is not None and found.lastindex in includes:
+            result[filename] = lines
+    return result
+
+
+def compile_filefilter(rules):
+    """Check the format of filter rules and compile them into a single regular expression.
+
+    Compiled filters are cached, so this can be called up front to validate the rules
+    from a config file and to avoid compiling them later.
+
+    Parameters
+    ----------
+    rules : list
+        See ``matches_filefilter``.
+
+    Returns
+    -------
+    regex : re.Pattern
+        See ``_compile_filefilter``.
+    includes : frozenset
+        See ``_compile_filefilter``.
+
+    """
+    return _compile_filefilter(tuple(rules))
+
+
+@lru_cache(maxsize=None)
+def _compile_filefilter(rules):
+    """Check the format of filter rules and compile them into a single regular expression.
+
+    Parameters
+    ----------
+    rules : tuple
+        See ``matches_filefilter``.
+
+    Returns
+    -------
+    regex : re.Pattern
+        An alternation of the glob patterns, as used by ``fnmatch.fnmatch``, in the
+        order of the rules. The alternatives are tried from left to right, so the
+        first matching rule wins. The alternative of each rule is a named group,
+        ``include<i>`` or ``exclude<i>``, where ``<i>`` is the index of the rule.
+        Rules that cannot change the outcome are left out.
+    includes : frozenset
+        The group numbers of the include rules. The ``lastindex`` of a match is the
+        group number of the rule that matched, so the outcome of a match is found
+        without string operations.
+
+    """
     for rule in rules:
         if rule[0] not in '+-':
             raise ValueError('Unexpected first character in filename filter rule: {}'.format(
                 rule[0]))
+    alternatives = []
+    nkeep = 0
+    for index, rule in enumerate(rules):
+        pattern = os.path.normcase(rule[1:].strip())
+        alternatives.append('(?P<{}{}>{})'.format(
+            'include' if rule[0] == '+' else 'exclude', index, _translate(pattern)))
+        if rule[0] == '+':
+            nkeep = len(alternatives)
+        if pattern == '*':
+            # All later rules are unreachable.
+            break
+    # Exclude rules after the last include rule are redundant because files that
+    # match no rule are excluded anyway.
+    del alternatives[nkeep:]
+    if not alternatives:
+        # Never match anything.
+        return re.compile(r'(?!)'), frozenset()
+    regex = re.compile('|'.join(alternatives))
+    includes = frozenset(group for name, group in regex.groupindex.items()
+                         if name.startswith('include'))
+    return regex, includes
 
-    for rule in rules:
-        pattern = rule[1:].strip()
-        if fnmatch(filename, pattern):
-            return rule[0] == '+'
-    return False
+
+# Characters with a special meaning in glob patterns.
+_GLOB_SPECIAL = re.compile(r'[*?[]')
+
+
+def _translate(pattern):
+    """Translate a glob pattern into a regular expression.
+
+    Literal filenames and directory prefixes (a literal followed by a single star),
+    which are common in filter rules, are translated into plain string matches. The
+    result is equivalent to ``fnmatch.translate``, but it avoids the ``.*`` that
+    would otherwise scan to the end of every filename.
+    """
+    if not _GLOB_SPECIAL.search(pattern):
+        return re.escape(pattern) + r'\Z'
+    if pattern.endswith('*') and not _GLOB_SPECIAL.search(pattern[:-1]):
+        return re.escape(pattern[:-1])
+    return translate(pattern)